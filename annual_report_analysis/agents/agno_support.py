@@ -1,51 +1,105 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, List
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
 
-from .memory import LongTermMemory
+from .memory import LongTermMemory, prior_points
 from .prompts import AGNO_SYSTEM_PROMPTS
-from .state import AgentMessage, SectionName, WorkflowState
+from .state import AgentMessage, DocumentChunk, SectionName, WorkflowState
 from .tools import (
     analyze_sentiment_finbert_stub,
     detect_risk_fingpt_stub,
     guess_section,
     extract_good_bad_points,
 )
-from .transformer_tools import analyze_sentiment_finbert, detect_risk_fingpt
+from .transformer_tools import analyze_sentiment_finbert_batch, detect_risk_fingpt_batch
+
+
+try:
+    from agno.agent import Agent  # type: ignore
+    from agno.team import Team  # type: ignore
+    _AGNO_AVAILABLE = True
+except Exception:
+    _AGNO_AVAILABLE = False
+
+# Reuse centralized agent definitions in agents.py
+try:
+    from .agents import agno_tools, build_agno_team as _build_team  # type: ignore
+except Exception:
+    agno_tools = None  # type: ignore
+    _build_team = None  # type: ignore
+
+
+# Fixed "[section] prompt" head of every section summary
+_SUMMARY_PREFIX: Dict[SectionName, str] = {
+    section: f"[{section.value}] {AGNO_SYSTEM_PROMPTS.get(section.value, AGNO_SYSTEM_PROMPTS['other'])}\n\n"
+    for section in SectionName
+}
+
+
+# Simple related-sections map to emulate inter-agent collaboration
+_RELATED_SECTIONS: Dict[SectionName, Tuple[SectionName, ...]] = {
+    SectionName.mdna: (SectionName.financial_statements, SectionName.audit_report),
+    SectionName.financial_statements: (SectionName.audit_report, SectionName.mdna),
+    SectionName.audit_report: (SectionName.financial_statements, SectionName.corporate_governance),
+    SectionName.esg: (SectionName.corporate_governance,),
+    SectionName.corporate_governance: (SectionName.esg,),
+    SectionName.letter_to_shareholders: (SectionName.mdna,),
+    SectionName.sdg_17: (SectionName.esg,),
+    SectionName.other: (),
+}
 
 
 def is_agno_available() -> bool:
-    try:
-        from agno.agent import Agent  # type: ignore
-        from agno.team import Team  # type: ignore
-        _ = (Agent, Team)
-        return True
-    except Exception:
-        return False
+    return _AGNO_AVAILABLE
 
 
 def _default_tools() -> Dict[str, Callable[..., Any]]:
-    return {
-        "analyze_sentiment": lambda text: analyze_sentiment_finbert(text)
-        or analyze_sentiment_finbert_stub(text),
-        "detect_risk": lambda text: detect_risk_fingpt(text)
-        or detect_risk_fingpt_stub(text),
-        "extract_good_bad": extract_good_bad_points,
-        "guess_section": guess_section,
-    }
+    return agno_tools() if agno_tools is not None else {}
 
 
 def build_agno_team(ltm: LongTermMemory):
-    # Reuse centralized agent definitions in agents.py
+    if _build_team is None:
+        return None
     try:
-        from .agents import build_agno_team as _build_team  # type: ignore
         return _build_team()
     except Exception:
         return None
 
 
+async def _dispatch(agent: Any, prompt: str) -> Any:
+    """Send a prompt to an agent without blocking the event loop."""
+    try:
+        # Send as a message to the chosen agent via team. API may vary; we emulate a call interface.
+        arun = getattr(agent, "arun", None)
+        if arun is not None:
+            return await arun(prompt)
+        return await asyncio.to_thread(agent.run, prompt)
+    except Exception:
+        return None
+
+
 def run_with_agno(state: WorkflowState) -> WorkflowState:
-    ltm = LongTermMemory()
+    """Synchronous entry point; async callers should await run_with_agno_async() instead."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run_with_agno_async(state))
+    # Called from inside a running event loop (notebooks, async hosts): asyncio.run()
+    # would fail there, so run on a fresh loop in a worker thread and wait for it
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, run_with_agno_async(state)).result()
+
+
+async def run_with_agno_async(state: WorkflowState) -> WorkflowState:
+    # The store is closed (and its writes committed) when the run ends
+    with LongTermMemory() as ltm:
+        return await _analyze_with_agno(state, ltm)
+
+
+async def _analyze_with_agno(state: WorkflowState, ltm: LongTermMemory) -> WorkflowState:
     build = build_agno_team(ltm)
     if not build:
         return state
@@ -55,43 +109,46 @@ def run_with_agno(state: WorkflowState) -> WorkflowState:
         # Keep loader centralized in workflow to avoid new deps
         return state
 
-    # Simple related-sections map to emulate inter-agent collaboration
-    related_sections: Dict[SectionName, List[SectionName]] = {
-        SectionName.mdna: [SectionName.financial_statements, SectionName.audit_report],
-        SectionName.financial_statements: [SectionName.audit_report, SectionName.mdna],
-        SectionName.audit_report: [SectionName.financial_statements, SectionName.corporate_governance],
-        SectionName.esg: [SectionName.corporate_governance],
-        SectionName.corporate_governance: [SectionName.esg],
-        SectionName.letter_to_shareholders: [SectionName.mdna],
-        SectionName.sdg_17: [SectionName.esg],
-        SectionName.other: [],
+    # Run the transformers once over the distinct contents of all pending chunks; repeated
+    # boilerplate (headers, disclaimers, ...) reuses the same results
+    pending = state.chunks[state.cursor :]
+    texts = list(dict.fromkeys(c.content for c in pending))
+    analysis_by_content: Dict[str, Tuple[Any, Any, Dict[str, List[str]]]] = {
+        text: (
+            sentiment or analyze_sentiment_finbert_stub(text),
+            risks or detect_risk_fingpt_stub(text),
+            extract_good_bad_points(text),
+        )
+        for text, sentiment, risks in zip(
+            texts, analyze_sentiment_finbert_batch(texts), detect_risk_fingpt_batch(texts)
+        )
     }
 
-    # Message passing: supervisor routes chunks, section agents reply
-    for chunk in state.chunks[state.cursor :]:
+    # Prompts and state/memory writes are built chunk by chunk, in order, so each chunk's
+    # prior context includes the decisions recorded for the chunks before it (as in the
+    # fallback workflow). Only the agent calls, which are I/O bound, run concurrently.
+    chunk_prompts: List[List[Tuple[Any, str]]] = []
+    for chunk in pending:
         primary = chunk.section_hint or guess_section(chunk.content) or SectionName.other
         # Decide collaboration targets
         targets = {primary}
-        for sec in related_sections.get(primary, []):
+        for sec in _RELATED_SECTIONS.get(primary, ()):
             targets.add(sec)
 
+        # Chunk-level analysis is shared by every target section
+        sentiment, risks, decisions = analysis_by_content[chunk.content]
+        summary_body = chunk.content[:800] + ("..." if len(chunk.content) > 800 else "")
+
+        prompts = []
         for section in targets:
             state.routed_chunks.setdefault(section, []).append(chunk.chunk_id)
 
             # Load prior context from LTM
-            prior_records = ltm.query_all(agent_name=section.value, section=section)
-            prior_good: List[str] = []
-            prior_bad: List[str] = []
-            for r in prior_records[-20:]:
-                v = r.get("value", {}) if isinstance(r, dict) else {}
-                good_list = v.get("good_points") or []
-                bad_list = v.get("bad_points") or []
-                if isinstance(good_list, list):
-                    prior_good.extend([str(x) for x in good_list][:2])
-                if isinstance(bad_list, list):
-                    prior_bad.extend([str(x) for x in bad_list][:2])
-
-            context_snippet = "\n".join([f"- GOOD: {g}" for g in prior_good[:3]] + [f"- BAD: {b}" for b in prior_bad[:3]])
+            recent = ltm.query_recent(agent_name=section.value, section=section, limit=20)
+            prior_good = prior_points(recent, "good_points", per_record=2, limit=3)
+            prior_bad = prior_points(recent, "bad_points", per_record=2, limit=3)
+
+            context_snippet = "\n".join([f"- GOOD: {g}" for g in prior_good] + [f"- BAD: {b}" for b in prior_bad])
             context_header = f"Prior context for {section.value}:\n{context_snippet}\n\n" if context_snippet else ""
 
             # Prepare context prompt
@@ -100,29 +157,12 @@ def run_with_agno(state: WorkflowState) -> WorkflowState:
                 f"Return a concise summary, sentiment, risks, good_points and bad_points as JSON fields.\n\n"
                 f"{context_header}{chunk.content}"
             )
-
-            try:
-                # Send as a message to the chosen agent via team. API may vary; we emulate a call interface.
-                agent = section_agents[section]
-                _ = agent.run(prompt)  # type: ignore[attr-defined]
-            except Exception:
-                _ = None
+            prompts.append((section_agents[section], prompt))
 
             # Deterministic post-processing and memory write
-            guidance = AGNO_SYSTEM_PROMPTS.get(section.value, AGNO_SYSTEM_PROMPTS["other"])  # type: ignore[index]
-            summary_body = (chunk.content[:800] + ("..." if len(chunk.content) > 800 else ""))
-            summary = f"[{section.value}] {guidance}\n\n{context_header}{summary_body}"
-
-            sentiment = analyze_sentiment_finbert(chunk.content) or analyze_sentiment_finbert_stub(chunk.content)
-            risks = detect_risk_fingpt(chunk.content) or detect_risk_fingpt_stub(chunk.content)
-            decisions = extract_good_bad_points(chunk.content)
-
-            prev_summary = state.section_summaries.get(section, "")
-            combined_summary = (prev_summary + "\n\n" + summary).strip() if prev_summary else summary
-            state.section_summaries[section] = combined_summary
-            state.section_findings.setdefault(section, {})
-            state.section_findings[section].setdefault("sentiment", []).append(sentiment)
-            state.section_findings[section].setdefault("risks", []).append(risks)
+            summary = _SUMMARY_PREFIX[section] + context_header + summary_body
+            state.section_summaries.setdefault(section, []).append(summary)
+            state.add_findings(section, sentiment, risks)
 
             ltm.upsert(
                 agent_name=section.value,
@@ -137,6 +177,7 @@ def run_with_agno(state: WorkflowState) -> WorkflowState:
                 },
             )
 
+            # Message passing: section agents reply to the supervisor
             state.mailbox.append(
                 AgentMessage(
                     sender=section.value,
@@ -152,13 +193,21 @@ def run_with_agno(state: WorkflowState) -> WorkflowState:
                 )
             )
 
+        chunk_prompts.append(prompts)
         state.cursor += 1
 
+    # Bounds how many chunks have agent calls in flight at once
+    semaphore = asyncio.Semaphore(int(os.environ.get("ANNUAL_WORKERS", os.cpu_count() or 4)))
+
+    async def _send_chunk(prompts: List[Tuple[Any, str]]) -> None:
+        # The target sections' agent calls for one chunk run concurrently
+        async with semaphore:
+            await asyncio.gather(*(_dispatch(agent, prompt) for agent, prompt in prompts))
+
+    await asyncio.gather(*(_send_chunk(prompts) for prompts in chunk_prompts))
+
     # Aggregate global report
-    parts: List[str] = []
-    for name, summary in state.section_summaries.items():
-        parts.append(f"## {name.value}\n{summary}")
-    state.global_report = "\n\n".join(parts)
+    state.global_report = state.build_global_report()
     state.done = True
     return state
 
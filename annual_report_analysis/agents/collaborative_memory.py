@@ -1,8 +1,10 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
-@dataclass
+from .state import DATACLASS_SLOTS
+
+@dataclass(**DATACLASS_SLOTS)
 class SharedInsight:
     agent_name: str
     section_name: str
@@ -16,48 +18,51 @@ class SharedInsight:
 class CollaborativeMemory:
     def __init__(self):
         self.shared_insights: List[SharedInsight] = []
-        self.agent_subscriptions: Dict[str, List[str]] = {}
-        self.cross_references: Dict[str, List[str]] = {}
+        # Publishers per subscriber, as insertion-ordered sets
+        self.agent_subscriptions: Dict[str, Dict[str, None]] = {}
+        # Related sections per section; dicts used as insertion-ordered sets
+        self.cross_references: Dict[str, Dict[str, None]] = {}
+        # Insights indexed by publishing agent and by every section they concern
+        self._insights_by_agent: Dict[str, List[SharedInsight]] = {}
+        self._insights_by_section: Dict[str, List[SharedInsight]] = {}
         
     def share_insight(self, insight: SharedInsight) -> None:
         """Share a new insight with other agents"""
         self.shared_insights.append(insight)
+        self._insights_by_agent.setdefault(insight.agent_name, []).append(insight)
+        for section_name in dict.fromkeys([insight.section_name, *insight.related_sections]):
+            self._insights_by_section.setdefault(section_name, []).append(insight)
         # Notify subscribed agents
         self._notify_subscribers(insight)
     
     def subscribe_to_agent(self, subscriber: str, publisher: str) -> None:
         """Subscribe an agent to another agent's insights"""
-        if subscriber not in self.agent_subscriptions:
-            self.agent_subscriptions[subscriber] = []
-        if publisher not in self.agent_subscriptions[subscriber]:
-            self.agent_subscriptions[subscriber].append(publisher)
+        self.agent_subscriptions.setdefault(subscriber, {})[publisher] = None
     
     def get_agent_insights(self, agent_name: str, since: Optional[datetime] = None) -> List[SharedInsight]:
         """Get insights shared by a specific agent"""
-        insights = [i for i in self.shared_insights if i.agent_name == agent_name]
+        insights = self._insights_by_agent.get(agent_name, [])
         if since:
-            insights = [i for i in insights if i.timestamp > since]
-        return insights
+            return [i for i in insights if i.timestamp > since]
+        return list(insights)
     
     def get_section_insights(self, section_name: str) -> List[SharedInsight]:
         """Get all insights related to a specific section"""
-        return [i for i in self.shared_insights if i.section_name == section_name or section_name in i.related_sections]
+        return list(self._insights_by_section.get(section_name, []))
     
     def add_cross_reference(self, section1: str, section2: str) -> None:
         """Add a cross-reference between two sections"""
-        if section1 not in self.cross_references:
-            self.cross_references[section1] = []
-        if section2 not in self.cross_references[section2]:
-            self.cross_references[section2] = []
-        
-        if section2 not in self.cross_references[section1]:
-            self.cross_references[section1].append(section2)
-        if section1 not in self.cross_references[section2]:
-            self.cross_references[section2].append(section1)
+        self.add_cross_references([(section1, section2)])
+
+    def add_cross_references(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Add a batch of symmetric cross-references between sections"""
+        for section1, section2 in pairs:
+            self.cross_references.setdefault(section1, {})[section2] = None
+            self.cross_references.setdefault(section2, {})[section1] = None
     
     def get_related_sections(self, section_name: str) -> List[str]:
         """Get all sections related to a given section"""
-        return self.cross_references.get(section_name, [])
+        return list(self.cross_references.get(section_name, ()))
     
     def _notify_subscribers(self, insight: SharedInsight) -> None:
         """Notify all subscribed agents of new insights"""
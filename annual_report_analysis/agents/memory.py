@@ -1,53 +1,270 @@
 from __future__ import annotations
 
+import heapq
 import json
+import math
+import re
+import sqlite3
+from collections import Counter, deque
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Deque, Dict, Iterable, List, Optional, Tuple
 
 from .state import AgentMessage, SectionName
 
+try:
+    import orjson  # type: ignore
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    _loads = orjson.loads
+except ImportError:
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
 
 class ShortTermMemory:
     def __init__(self, capacity: int = 20) -> None:
         self.capacity = capacity
-        self.messages: List[AgentMessage] = []
+        self.messages: Deque[AgentMessage] = deque(maxlen=capacity)
 
     def add(self, message: AgentMessage) -> None:
         self.messages.append(message)
-        if len(self.messages) > self.capacity:
-            self.messages = self.messages[-self.capacity :]
 
     def get(self) -> List[AgentMessage]:
         return list(self.messages)
 
 
 class LongTermMemory:
-    def __init__(self, base_dir: str | Path = "./annual_report_analysis/memory_store") -> None:
+    """Per-(agent, section) decision records stored in SQLite.
+
+    Records live in `<base_dir>/ltm.db`, indexed on (agent_name, section); like the
+    JSONL files of earlier versions, every upsert appends a record. The database is
+    opened on first use. The most recent `max_cached_records` per (agent, section)
+    are also kept in memory for query_recent() and search(); query_all() reads from
+    the database. Writes are committed every `flush_every` upserts and on
+    flush()/close(); use the store as a context manager to close it.
+    """
+
+    def __init__(
+        self,
+        base_dir: str | Path = "./annual_report_analysis/memory_store",
+        max_cached_records: int = 256,
+        flush_every: int = 64,
+    ) -> None:
         self.base_path = Path(base_dir)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self._conn: Optional[sqlite3.Connection] = None
+        self.flush_every = flush_every
+        self._pending = 0
+        # Most recent records per (agent, section), loaded lazily on first query
+        self.max_cached_records = max_cached_records
+        self._cache: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+        # Term counts of each cached record's good/bad points (aligned with _cache) and
+        # document frequencies over them, kept in sync on upsert for search()
+        self._terms: Dict[Tuple[str, str], Deque[Counter]] = {}
+        self._doc_freq: Dict[Tuple[str, str], Counter] = {}
+
+    def __enter__(self) -> "LongTermMemory":
+        return self
 
-    def _path(self, agent_name: str, section: Optional[SectionName]) -> Path:
-        section_part = section.value if section else "global"
-        agent_dir = self.base_path / agent_name
-        agent_dir.mkdir(parents=True, exist_ok=True)
-        return agent_dir / f"{section_part}.jsonl"
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """The SQLite connection, opened (and the schema created) on first use."""
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.base_path / "ltm.db"), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            is_new = conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='records'"
+            ).fetchone() is None
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                "agent_name TEXT NOT NULL, section TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_section ON records (agent_name, section)")
+            self._conn = conn
+            if is_new:
+                self._import_jsonl()
+            conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _cache_key(agent_name: str, section: Optional[SectionName]) -> Tuple[str, str]:
+        return agent_name, section.value if section else "global"
 
     def upsert(self, agent_name: str, section: Optional[SectionName], key: str, value: Dict[str, Any]) -> None:
-        path = self._path(agent_name, section)
-        with path.open("a") as fp:
-            fp.write(json.dumps({"key": key, "value": value}) + "\n")
+        record = {"key": key, "value": value}
+        cache_key = self._cache_key(agent_name, section)
+        self.conn.execute(
+            "INSERT INTO records (agent_name, section, key, value) VALUES (?, ?, ?, ?)",
+            (*cache_key, key, _dumps(value).decode()),
+        )
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            cached.append(record)
+        terms = self._terms.get(cache_key)
+        if terms is not None:
+            doc_freq = self._doc_freq[cache_key]
+            if len(terms) == terms.maxlen:
+                # Drop terms no cached record uses any more so the vocabulary stays bounded
+                for term in terms[0]:
+                    if doc_freq[term] <= 1:
+                        del doc_freq[term]
+                    else:
+                        doc_freq[term] -= 1
+            terms.append(_record_terms(record))
+            doc_freq.update(terms[-1].keys())
 
     def query_all(self, agent_name: str, section: Optional[SectionName]) -> List[Dict[str, Any]]:
-        path = self._path(agent_name, section)
-        if not path.exists():
+        """Return every record in insertion order."""
+        rows = self.conn.execute(
+            "SELECT key, value FROM records WHERE agent_name = ? AND section = ? ORDER BY rowid",
+            self._cache_key(agent_name, section),
+        )
+        return _decode_rows(rows)
+
+    def query_recent(self, agent_name: str, section: Optional[SectionName], limit: int = 20) -> List[Dict[str, Any]]:
+        """Return the `limit` most recent records (at most `max_cached_records`) in insertion order."""
+        recent = list(islice(reversed(self._records(agent_name, section)), limit))
+        recent.reverse()
+        return recent
+
+    def search(
+        self, agent_name: str, section: Optional[SectionName], query_text: str, top_k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Return up to `top_k` cached records whose good/bad points best match `query_text`.
+
+        Records are ranked by TF-IDF over their good/bad points; records sharing no
+        terms with the query are left out. Ties go to the more recent record.
+        """
+        cache_key = self._cache_key(agent_name, section)
+        records = self._records(agent_name, section)
+        terms = self._terms.get(cache_key)
+        if terms is None:
+            terms = deque((_record_terms(r) for r in records), maxlen=self.max_cached_records)
+            self._terms[cache_key] = terms
+            doc_freq: Counter = Counter()
+            for counts in terms:
+                doc_freq.update(counts.keys())
+            self._doc_freq[cache_key] = doc_freq
+        doc_freq = self._doc_freq[cache_key]
+
+        n_docs = len(terms)
+        query_terms = set(_tokenize(query_text))
+        idf = {t: math.log((1 + n_docs) / (1 + doc_freq[t])) + 1.0 for t in query_terms if doc_freq[t] > 0}
+        if not idf:
             return []
-        results: List[Dict[str, Any]] = []
-        with path.open() as fp:
-            for line in fp:
+        scored = []
+        for pos, counts in enumerate(terms):
+            score = sum(counts[t] * weight for t, weight in idf.items() if t in counts)
+            if score > 0:
+                scored.append((score, pos))
+        return [records[pos] for _, pos in heapq.nlargest(top_k, scored)]
+
+    def _records(self, agent_name: str, section: Optional[SectionName]) -> Deque[Dict[str, Any]]:
+        cache_key = self._cache_key(agent_name, section)
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            cached = self._cache.setdefault(cache_key, self._load(cache_key))
+        return cached
+
+    def flush(self) -> None:
+        """Commit any pending writes."""
+        if self._conn is not None:
+            self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+        self._pending = 0
+
+    def export_jsonl(self, out_dir: str | Path | None = None) -> None:
+        """Dump all records as `<agent>/<section>.jsonl` files for inspection."""
+        out_path = Path(out_dir) if out_dir is not None else self.base_path
+        handles: Dict[Path, BinaryIO] = {}
+        try:
+            rows = self.conn.execute("SELECT agent_name, section, key, value FROM records ORDER BY rowid")
+            for agent_name, section, key, value in rows:
+                path = out_path / agent_name / f"{section}.jsonl"
+                fp = handles.get(path)
+                if fp is None:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    fp = handles[path] = path.open("wb")
+                fp.write(_dumps({"key": key, "value": _loads(value)}) + b"\n")
+        finally:
+            for fp in handles.values():
+                fp.close()
+
+    def _load(self, cache_key: Tuple[str, str]) -> Deque[Dict[str, Any]]:
+        rows = self.conn.execute(
+            "SELECT key, value FROM records WHERE agent_name = ? AND section = ? ORDER BY rowid DESC LIMIT ?",
+            (*cache_key, self.max_cached_records),
+        ).fetchall()
+        rows.reverse()
+        return deque(_decode_rows(rows), maxlen=self.max_cached_records)
+
+    def _import_jsonl(self) -> None:
+        """Load records from the JSONL files written by earlier versions of the store."""
+        for path in sorted(self.base_path.glob("*/*.jsonl")):
+            agent_name, section = path.parent.name, path.stem
+            for line in path.read_bytes().splitlines():
                 try:
-                    results.append(json.loads(line))
+                    record = _loads(line)
+                    self._conn.execute(
+                        "INSERT INTO records (agent_name, section, key, value) VALUES (?, ?, ?, ?)",
+                        (agent_name, section, str(record["key"]), _dumps(record["value"]).decode()),
+                    )
                 except Exception:
                     continue
-        return results
 
 
+def _decode_rows(rows: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for key, value in rows:
+        try:
+            results.append({"key": key, "value": _loads(value)})
+        except Exception:
+            continue
+    return results
+
+
+_TOKEN_SPLIT = re.compile(r"\W+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_SPLIT.split(text.lower()) if t]
+
+
+def _record_points(record: Dict[str, Any], field_name: str) -> List[Any]:
+    value = record.get("value") if isinstance(record, dict) else None
+    items = value.get(field_name) if isinstance(value, dict) else None
+    return items if isinstance(items, list) else []
+
+
+def _record_terms(record: Dict[str, Any]) -> Counter:
+    points = chain(_record_points(record, "good_points"), _record_points(record, "bad_points"))
+    return Counter(_tokenize(" ".join(map(str, points))))
+
+
+def prior_points(
+    records: Iterable[Dict[str, Any]], field_name: str, per_record: int, limit: int
+) -> List[str]:
+    """Flatten up to `per_record` points of `field_name` from each record, `limit` in total."""
+    per_record_points = (islice(_record_points(r, field_name), per_record) for r in records)
+    return list(islice(map(str, chain.from_iterable(per_record_points)), limit))
@@ -1,7 +1,12 @@
+import itertools
+import re
 from typing import List, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from .state import DATACLASS_SLOTS
+from .tools import build_keyword_matcher
+
 class TaskType(Enum):
     FINANCIAL_ANALYSIS = "financial_analysis"
     RISK_ASSESSMENT = "risk_assessment"
@@ -12,7 +17,43 @@ class TaskType(Enum):
     STRATEGY_REVIEW = "strategy_review"
     COMPLIANCE_CHECK = "compliance_check"
 
-@dataclass
+# Patterns for common financial metrics, compiled once
+_FINANCIAL_METRIC_PATTERNS = tuple(
+    (f"FINANCIAL_{metric_type.upper()}", re.compile(pattern, re.IGNORECASE))
+    for metric_type, pattern in {
+        'revenue': r'\$?\d+\.?\d*\s*(million|billion|trillion|M|B|T)?\s*(revenue|sales)',
+        'profit': r'\$?\d+\.?\d*\s*(million|billion|trillion|M|B|T)?\s*(profit|earnings|net income)',
+        'growth': r'\d+\.?\d*%\s*(growth|increase|decrease)',
+        'margin': r'\d+\.?\d*%\s*(margin|profitability)',
+        'ratio': r'(P/E|debt[- ]to[- ]equity|current|quick)\s*ratio\s*of\s*\d+\.?\d*'
+    }.items()
+)
+
+# Named entity types kept by _extract_key_entities
+_ENTITY_LABELS = frozenset({'ORG', 'PERSON', 'GPE', 'MONEY', 'PERCENT'})
+
+_nlp = None
+_nlp_load_attempted = False
+
+
+def _get_nlp():
+    """Load the spaCy English model once, with only the NER pipe enabled."""
+    global _nlp, _nlp_load_attempted
+    if not _nlp_load_attempted:
+        _nlp_load_attempted = True
+        try:
+            import spacy
+
+            _nlp = spacy.load("en_core_web_sm")
+            # Tagger, parser and lemmatizer are not needed for entities
+            _nlp.select_pipes(enable=["ner"])
+        except Exception as e:
+            print(f"Entity extraction error: {str(e)}")
+            _nlp = None
+    return _nlp
+
+# One instance per (chunk, task type)
+@dataclass(**DATACLASS_SLOTS)
 class DecomposedTask:
     task_type: TaskType
     content: str
@@ -70,6 +111,13 @@ class TaskDecomposer:
             TaskType.COMPLIANCE_CHECK: ["audit_report", "corporate_governance"]
         }
 
+        # All task patterns compiled into one matcher so content is scanned once
+        self._match_tasks = build_keyword_matcher(
+            (pattern, task_type)
+            for task_type, patterns in self.task_patterns.items()
+            for pattern in patterns
+        )
+
     def decompose_content(self, content: str) -> List[DecomposedTask]:
         """
         Decompose content into specific tasks based on content analysis
@@ -77,15 +125,18 @@ class TaskDecomposer:
         decomposed_tasks = []
         
         # Analyze content and identify relevant task types
-        for task_type, patterns in self.task_patterns.items():
-            if any(pattern.lower() in content.lower() for pattern in patterns):
+        matched = set(self._match_tasks(content.lower()))
+        # Entities depend only on the content, so extract them once for all tasks
+        entities = self._extract_key_entities(content) if matched else []
+        for task_type in self.task_patterns:
+            if task_type in matched:
                 # Create task with relevant metadata
                 task = DecomposedTask(
                     task_type=task_type,
                     content=content,
                     priority=self._determine_priority(task_type, content),
                     dependencies=self._identify_dependencies(task_type),
-                    metadata=self._extract_metadata(content, task_type),
+                    metadata=self._extract_metadata(content, task_type, entities),
                     target_agents=self.task_agent_mapping[task_type]
                 )
                 decomposed_tasks.append(task)
@@ -124,14 +175,14 @@ class TaskDecomposer:
         }
         return dependency_map.get(task_type, [])
 
-    def _extract_metadata(self, content: str, task_type: TaskType) -> Dict[str, Any]:
+    def _extract_metadata(self, content: str, task_type: TaskType, entities: List[str]) -> Dict[str, Any]:
         """
         Extract relevant metadata for the task
         """
         metadata = {
             "content_length": len(content),
             "task_type": task_type.value,
-            "extracted_entities": self._extract_key_entities(content),
+            "extracted_entities": list(entities),
             "timestamp": "",  # Add timestamp if needed
         }
         return metadata
@@ -140,19 +191,17 @@ class TaskDecomposer:
         """
         Extract key entities from content using spaCy NER
         """
+        nlp = _get_nlp()
+        if nlp is None:
+            return []
         try:
-            import spacy
-            
-            # Load the English language model
-            nlp = spacy.load("en_core_web_sm")
-            
             # Process the text
             doc = nlp(content)
             
             # Extract named entities
             entities = []
             for ent in doc.ents:
-                if ent.label_ in ['ORG', 'PERSON', 'GPE', 'MONEY', 'PERCENT']:
+                if ent.label_ in _ENTITY_LABELS:
                     entities.append({
                         'text': ent.text,
                         'type': ent.label_
@@ -161,12 +210,13 @@ class TaskDecomposer:
             # Extract key financial metrics
             financial_metrics = self._extract_financial_metrics(content)
             
-            # Combine all entities
-            all_entities = [
-                str(entity) for entity in entities + financial_metrics
-            ]
+            # Combine all entities, dropping duplicates by (text, type)
+            unique_entities = {
+                (entity['text'], entity['type']): entity
+                for entity in itertools.chain(entities, financial_metrics)
+            }
             
-            return list(set(all_entities))  # Remove duplicates
+            return [str(entity) for entity in unique_entities.values()]
             
         except Exception as e:
             print(f"Entity extraction error: {str(e)}")
@@ -176,28 +226,11 @@ class TaskDecomposer:
         """
         Extract financial metrics using regex patterns
         """
-        import re
-        
-        metrics = []
-        
-        # Patterns for common financial metrics
-        patterns = {
-            'revenue': r'\$?\d+\.?\d*\s*(million|billion|trillion|M|B|T)?\s*(revenue|sales)',
-            'profit': r'\$?\d+\.?\d*\s*(million|billion|trillion|M|B|T)?\s*(profit|earnings|net income)',
-            'growth': r'\d+\.?\d*%\s*(growth|increase|decrease)',
-            'margin': r'\d+\.?\d*%\s*(margin|profitability)',
-            'ratio': r'(P/E|debt[- ]to[- ]equity|current|quick)\s*ratio\s*of\s*\d+\.?\d*'
-        }
-        
-        for metric_type, pattern in patterns.items():
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                metrics.append({
-                    'text': match.group(0),
-                    'type': f'FINANCIAL_{metric_type.upper()}'
-                })
-                
-        return metrics
+        return [
+            {'text': match.group(0), 'type': metric_type}
+            for metric_type, pattern in _FINANCIAL_METRIC_PATTERNS
+            for match in pattern.finditer(content)
+        ]
 
     def _optimize_task_sequence(self, tasks: List[DecomposedTask]) -> List[DecomposedTask]:
         """
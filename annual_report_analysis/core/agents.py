@@ -1,217 +1,356 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Any  # noqa: F401
+import sys
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Any, Tuple  # noqa: F401
 
-from .memory import LongTermMemory, ShortTermMemory
+from .memory import LongTermMemory, ShortTermMemory, prior_points
 from .prompts import SECTION_GUIDANCE, AGNO_SYSTEM_PROMPTS
 from .state import AgentMessage, DocumentChunk, SectionName, WorkflowState
 from .tools import (
     analyze_sentiment_finbert_stub,
+    build_keyword_matcher,
     detect_risk_fingpt_stub,
     guess_section,
     extract_good_bad_points,
 )
-from .transformer_tools import analyze_sentiment_finbert, detect_risk_fingpt, detect_financial_shenanigans
+from .transformer_tools import (
+    MAX_MODEL_CHARS,
+    analyze_sentiment_finbert,
+    analyze_sentiment_finbert_batch,
+    detect_risk_fingpt,
+    detect_risk_fingpt_batch,
+    detect_financial_shenanigans_batch,
+)
 from .enhanced_tools import WebSearchTool, FinanceDataTool, WebCrawlerTool, NewsTool
 from .task_decomposition import TaskDecomposer, DecomposedTask, TaskType
 
 
+# Fixed "[section] guidance - Task: " head of every section summary
+_SUMMARY_PREFIX: Dict[SectionName, str] = {
+    section: f"[{section.value}] {SECTION_GUIDANCE.get(section.value, SECTION_GUIDANCE['other'])} - Task: "
+    for section in SectionName
+}
+
+
+# Agent name (section value) -> SectionName, without going through Enum.__call__
+_SECTION_BY_VALUE: Dict[str, SectionName] = {section.value: section for section in SectionName}
+
+# Interned "[section] " tags prefixed to points borrowed from other sections
+_SECTION_TAGS: Dict[str, str] = {section.value: sys.intern(f"[{section.value}] ") for section in SectionName}
+
+# Sections each section agent collaborates with
+_RELATED_SECTIONS: Dict[str, Tuple[str, ...]] = {
+    'letter_to_shareholders': ('mdna', 'financial_statements'),
+    'mdna': ('financial_statements', 'letter_to_shareholders', 'risk_assessment'),
+    'financial_statements': ('mdna', 'audit_report'),
+    'audit_report': ('financial_statements', 'corporate_governance'),
+    'corporate_governance': ('esg', 'audit_report'),
+    'sdg_17': ('esg',),
+    'esg': ('corporate_governance', 'sdg_17'),
+    'other': ('letter_to_shareholders', 'mdna', 'financial_statements'),
+}
+
+# Lowercase keywords that make another section's insight relevant to a section.
+# This could be enhanced with more sophisticated relevance checking.
+_RELEVANCE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    'letter_to_shareholders': ('strategy', 'vision', 'outlook', 'leadership'),
+    'mdna': ('performance', 'operations', 'results', 'trends'),
+    'financial_statements': ('revenue', 'profit', 'assets', 'liabilities'),
+    'audit_report': ('opinion', 'compliance', 'controls', 'procedures'),
+    'corporate_governance': ('board', 'committee', 'policies', 'oversight'),
+    'sdg_17': ('sustainability', 'partnership', 'development', 'goals'),
+    'esg': ('environmental', 'social', 'governance', 'sustainability'),
+}
+
+# One compiled single-pass matcher per section
+_RELEVANCE_MATCHERS = {
+    section: build_keyword_matcher((keyword, True) for keyword in keywords)
+    for section, keywords in _RELEVANCE_KEYWORDS.items()
+}
+
+
+@lru_cache(maxsize=None)
+def _shared_tool(tool_cls):
+    """One instance of each enhanced tool per process (and one set of response caches)."""
+    return tool_cls()
+
+
+def analyze_chunk_contents(contents: List[str]) -> Dict[str, tuple]:
+    """Map each distinct content to its (sentiment, risks, shenanigans patterns).
+
+    Identical contents (repeated boilerplate) are only sent through the models once;
+    stubs fill in where a model is unavailable.
+    """
+    texts = list(dict.fromkeys(contents))
+    # Models only see the first MAX_MODEL_CHARS characters, so contents sharing that
+    # prefix share one inference
+    model_inputs = list(dict.fromkeys(text[:MAX_MODEL_CHARS] for text in texts))
+    inferred = dict(
+        zip(
+            model_inputs,
+            zip(
+                analyze_sentiment_finbert_batch(model_inputs),
+                detect_risk_fingpt_batch(model_inputs),
+                detect_financial_shenanigans_batch(model_inputs),
+            ),
+        )
+    )
+    analysis = {}
+    for text in texts:
+        sentiment, risks, shenanigans_patterns = inferred[text[:MAX_MODEL_CHARS]]
+        analysis[text] = (
+            sentiment or analyze_sentiment_finbert_stub(text),
+            risks or detect_risk_fingpt_stub(text),
+            shenanigans_patterns or {},
+        )
+    return analysis
+
+
 class SupervisorAgent:
+    __slots__ = ("ltm", "_stm", "task_decomposer", "section_agents")
+
     def __init__(self, ltm: LongTermMemory) -> None:
         self.ltm = ltm
-        self.stm = ShortTermMemory(capacity=20)
+        self._stm: Optional[ShortTermMemory] = None
         self.task_decomposer = TaskDecomposer()
         self.section_agents: Dict[str, BaseSectionAgent] = {}
 
-    def process_chunk(self, chunk: DocumentChunk, state: WorkflowState) -> None:
+    @property
+    def stm(self) -> ShortTermMemory:
+        """Short-term memory, created on first use."""
+        if self._stm is None:
+            self._stm = ShortTermMemory(capacity=50)
+        return self._stm
+
+    def route(self, chunk: DocumentChunk) -> SectionName:
+        if chunk.section_hint:
+            return chunk.section_hint
+        # guess_section caches its result per text digest, so re-routing a chunk skips the keyword scan
+        return guess_section(chunk.content) or SectionName.other
+
+    def aggregate_global(self, state: WorkflowState) -> None:
+        state.global_report = state.build_global_report()
+
+    def process_chunk(self, chunk: DocumentChunk, state: WorkflowState, analysis: Optional[tuple] = None) -> None:
+        """Decompose a chunk into tasks and run them; `analysis` may come from a batched
+        analyze_chunk_contents() call made by the driver over all chunks."""
         # First, decompose the chunk into specific tasks
         decomposed_tasks = self.task_decomposer.decompose_content(chunk.content)
+        if not decomposed_tasks:
+            return
+
+        # Every task's agents see the same text, so run the models on it once up front
+        if analysis is None:
+            analysis = analyze_chunk_contents([chunk.content])[chunk.content]
         
-        # Sort tasks by priority and dependencies
-        sorted_tasks = self._organize_tasks(decomposed_tasks)
+        # Group tasks into dependency levels
+        levels = self._organize_tasks(decomposed_tasks)
         
-        # Process each task with appropriate agents
-        for task in sorted_tasks:
-            self._process_task(task, chunk, state)
-            
-        # Collect and synthesize results
-        self._synthesize_results(chunk, state)
+        # Tasks run one at a time: levels in dependency order, tasks within a level by
+        # priority, so summaries and the LTM context each task sees are deterministic
+        touched: Dict[str, None] = {}  # ordered set of agents that handled the chunk
+        for level in levels:
+            for task in level:
+                touched.update(dict.fromkeys(self._process_task(task, chunk, state, analysis)))
 
-    def _organize_tasks(self, tasks: List[DecomposedTask]) -> List[DecomposedTask]:
+        # Collect and synthesize results from the agents that handled this chunk
+        self._synthesize_results(chunk, state, touched)
+
+    def _organize_tasks(self, tasks: List[DecomposedTask]) -> List[List[DecomposedTask]]:
         """
-        Organize tasks based on dependencies and priorities
+        Group tasks into dependency levels (Kahn's algorithm). Tasks in a level only
+        depend on earlier levels and are ordered by priority.
         """
-        # Create dependency graph
-        dependency_graph = {}
-        for task in tasks:
-            dependency_graph[task.task_type.value] = task.dependencies
-
-        # Topologically sort tasks considering dependencies and priorities
-        processed = set()
-        result = []
-
-        def process_task(task):
-            if task.task_type.value in processed:
-                return
+        # Index tasks by type once; in-degrees only count dependencies present in this
+        # chunk, dependencies on absent task types are ignored
+        by_name = {task.task_type.value: task for task in tasks}
+        in_degree = dict.fromkeys(by_name, 0)
+        dependents: Dict[str, List[str]] = {name: [] for name in by_name}
+        for name, task in by_name.items():
             for dep in task.dependencies:
-                dep_task = next((t for t in tasks if t.task_type.value == dep), None)
-                if dep_task:
-                    process_task(dep_task)
-            processed.add(task.task_type.value)
-            result.append(task)
-
-        # Process all tasks
-        sorted_tasks = sorted(tasks, key=lambda x: -x.priority)
-        for task in sorted_tasks:
-            process_task(task)
-
-        return result
-
-    def _process_task(self, task: DecomposedTask, chunk: DocumentChunk, state: WorkflowState) -> None:
+                if dep in by_name:
+                    in_degree[name] += 1
+                    dependents[dep].append(name)
+
+        def by_priority(names):
+            return sorted((by_name[name] for name in names), key=lambda x: -x.priority)
+
+        levels = []
+        ready = [name for name, degree in in_degree.items() if degree == 0]
+        while ready:
+            levels.append(by_priority(ready))
+            released = []
+            for name in ready:
+                for dependent in dependents[name]:
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        released.append(dependent)
+            ready = released
+
+        blocked = [name for name, degree in in_degree.items() if degree > 0]
+        if blocked:
+            # Dependency cycle: run whatever is left together
+            levels.append(by_priority(blocked))
+
+        return levels
+
+    def _process_task(
+        self, task: DecomposedTask, chunk: DocumentChunk, state: WorkflowState, analysis: Optional[tuple] = None
+    ) -> List[str]:
         """
-        Process a single decomposed task using appropriate agents
+        Process a single decomposed task using appropriate agents; returns their names
         """
         for agent_name in task.target_agents:
             if agent_name not in self.section_agents:
                 self.section_agents[agent_name] = BaseSectionAgent(
-                    SectionName(agent_name), self.ltm
+                    _SECTION_BY_VALUE[agent_name], self.ltm
                 )
             
-            agent = self.section_agents[agent_name]
-            # Create a task-specific chunk with relevant metadata
-            task_chunk = DocumentChunk(
-                content=chunk.content,
-                metadata={
-                    **chunk.metadata,
-                    "task_type": task.task_type.value,
-                    "task_priority": task.priority,
-                    "task_metadata": task.metadata
-                }
-            )
-            agent.handle(task_chunk, state)
+            # The agent reads the task's type, priority and metadata from the task itself
+            self.section_agents[agent_name].handle(chunk, state, analysis, task)
+        return task.target_agents
 
-    def _synthesize_results(self, chunk: DocumentChunk, state: WorkflowState) -> None:
+    def _synthesize_results(self, chunk: DocumentChunk, state: WorkflowState, agent_names: Iterable[str]) -> None:
         """
-        Synthesize results from all agents that processed the chunk
+        Synthesize results from the agents that processed the chunk
         """
+        # Only what is actually populated; results are stored by reference, not copied
         synthesis = {
-            "section_analyses": {},
-            "cross_section_insights": [],
-            "key_findings": [],
-            "recommendations": []
+            "section_analyses": {
+                agent_name: results
+                for agent_name in agent_names
+                if (results := self.section_agents[agent_name].latest_results)
+            }
         }
-        
-        # Collect results from each agent
-        for agent_name, agent in self.section_agents.items():
-            if agent_results := agent.get_latest_results():
-                synthesis["section_analyses"][agent_name] = agent_results
 
         # Add synthesis to state
-        state.add_synthesis(chunk.id, synthesis)
+        state.add_synthesis(chunk.chunk_id, synthesis)
 
 
 class BaseSectionAgent:
     def __init__(self, name: SectionName, ltm: LongTermMemory, collaborative_memory=None) -> None:
         self.name = name
         self.ltm = ltm
-        self.stm = ShortTermMemory(capacity=20)
+        self._stm: Optional[ShortTermMemory] = None
         self.latest_results = None
         self.collaborative_memory = collaborative_memory
         
-        # Initialize enhanced tools
-        self.web_search = WebSearchTool()
-        self.finance_data = FinanceDataTool()
-        self.web_crawler = WebCrawlerTool()
-        self.news_tool = NewsTool()
-        
-        # Define related sections for collaboration
-        self.related_sections = {
-            'letter_to_shareholders': ['mdna', 'financial_statements'],
-            'mdna': ['financial_statements', 'letter_to_shareholders', 'risk_assessment'],
-            'financial_statements': ['mdna', 'audit_report'],
-            'audit_report': ['financial_statements', 'corporate_governance'],
-            'corporate_governance': ['esg', 'audit_report'],
-            'sdg_17': ['esg'],
-            'esg': ['corporate_governance', 'sdg_17'],
-            'other': ['letter_to_shareholders', 'mdna', 'financial_statements']
-        }
+        # Related sections for collaboration (shared, read-only)
+        self.related_sections = _RELATED_SECTIONS
         
         # Set up collaborations if collaborative memory is provided
         if self.collaborative_memory:
             # Subscribe to related sections
-            for related_section in self.related_sections.get(self.name.value, []):
+            related = self.related_sections.get(self.name.value, ())
+            for related_section in related:
                 self.collaborative_memory.subscribe_to_agent(self.name.value, related_section)
-                # Add cross-references
-                self.collaborative_memory.add_cross_reference(self.name.value, related_section)
-                
+            # Add cross-references
+            self.collaborative_memory.add_cross_references(
+                (self.name.value, related_section) for related_section in related
+            )
+
+    @property
+    def stm(self) -> ShortTermMemory:
+        """Short-term memory, created on first use; agents that receive no chunks never need it."""
+        if self._stm is None:
+            self._stm = ShortTermMemory(capacity=20)
+        return self._stm
+
+    # Enhanced tools, created on first use and shared by all agents
+    @property
+    def web_search(self) -> WebSearchTool:
+        return _shared_tool(WebSearchTool)
+
+    @property
+    def finance_data(self) -> FinanceDataTool:
+        return _shared_tool(FinanceDataTool)
+
+    @property
+    def web_crawler(self) -> WebCrawlerTool:
+        return _shared_tool(WebCrawlerTool)
+
+    @property
+    def news_tool(self) -> NewsTool:
+        return _shared_tool(NewsTool)
+
     def _analyze_with_collaboration(self, text: str, collaborative_insights: Dict[str, List[Any]]) -> Dict[str, List[str]]:
         """Analyze text with awareness of related sections' insights"""
-        # Get base analysis
+        # Get base analysis; dicts serve as ordered sets so points are deduplicated as
+        # they are added, keeping first-seen order
         base_analysis = extract_good_bad_points(text)
+        good = dict.fromkeys(base_analysis['good'])
+        bad = dict.fromkeys(base_analysis['bad'])
         
         # Enhance analysis with collaborative insights
         for section, insights in collaborative_insights.items():
             if section != self.name.value:  # Don't process own insights
+                tag = _SECTION_TAGS.get(section) or f"[{section}] "
                 for insight in insights:
                     # Add relevant good points from related sections
-                    if 'good_points' in insight:
-                        base_analysis['good'].extend([
-                            f"[{section}] {point}" 
-                            for point in insight['good_points']
-                            if self._is_relevant_to_current_section(point)
-                        ])
+                    for point in insight.get('good_points', ()):
+                        if self._is_relevant_to_current_section(point):
+                            good.setdefault(tag + point)
                     
                     # Add relevant bad points from related sections
-                    if 'bad_points' in insight:
-                        base_analysis['bad'].extend([
-                            f"[{section}] {point}" 
-                            for point in insight['bad_points']
-                            if self._is_relevant_to_current_section(point)
-                        ])
+                    for point in insight.get('bad_points', ()):
+                        if self._is_relevant_to_current_section(point):
+                            bad.setdefault(tag + point)
         
-        # Deduplicate points while preserving section tags
-        base_analysis['good'] = list(set(base_analysis['good']))
-        base_analysis['bad'] = list(set(base_analysis['bad']))
+        base_analysis['good'] = list(good)
+        base_analysis['bad'] = list(bad)
         
         return base_analysis
     
     def _is_relevant_to_current_section(self, point: str) -> bool:
         """Determine if an insight from another section is relevant to current section"""
-        # This could be enhanced with more sophisticated relevance checking
-        section_keywords = {
-            'letter_to_shareholders': ['strategy', 'vision', 'outlook', 'leadership'],
-            'mdna': ['performance', 'operations', 'results', 'trends'],
-            'financial_statements': ['revenue', 'profit', 'assets', 'liabilities'],
-            'audit_report': ['opinion', 'compliance', 'controls', 'procedures'],
-            'corporate_governance': ['board', 'committee', 'policies', 'oversight'],
-            'sdg_17': ['sustainability', 'partnership', 'development', 'goals'],
-            'esg': ['environmental', 'social', 'governance', 'sustainability'],
-        }
-        
-        # Check if point contains keywords relevant to current section
-        current_keywords = section_keywords.get(self.name.value, [])
-        return any(keyword.lower() in point.lower() for keyword in current_keywords)
-
-    def handle(self, chunk: DocumentChunk, state: WorkflowState) -> None:
-        guidance = SECTION_GUIDANCE.get(self.name.value, SECTION_GUIDANCE["other"])
-        # Load prior decisions from LTM as context
-        prior_records = self.ltm.query_all(agent_name=self.name.value, section=self.name)
-        prior_good: list[str] = []
-        prior_bad: list[str] = []
-        for r in prior_records[-20:]:
-            v = r.get("value", {}) if isinstance(r, dict) else {}
-            good_list = v.get("good_points") or []
-            bad_list = v.get("bad_points") or []
-            if isinstance(good_list, list):
-                prior_good.extend([str(x) for x in good_list][:3])
-            if isinstance(bad_list, list):
-                prior_bad.extend([str(x) for x in bad_list][:3])
+        # Check if point contains keywords relevant to current section; stops at the first hit
+        matcher = _RELEVANCE_MATCHERS.get(self.name.value)
+        return matcher is not None and next(matcher(point.lower()), None) is not None
+
+    def handle(
+        self,
+        chunk: DocumentChunk,
+        state: WorkflowState,
+        analysis: Optional[tuple] = None,
+        task: Optional[DecomposedTask] = None,
+    ) -> None:
+        """Handle one chunk, optionally on behalf of a decomposed `task`; `analysis` is a
+        precomputed analyze_chunk_contents() entry for the chunk"""
+        if analysis is None:
+            analysis = analyze_chunk_contents([chunk.content])[chunk.content]
+        self._handle_chunk(chunk, state, *analysis, task=task)
+
+    def handle_batch(
+        self, chunks: List[DocumentChunk], state: WorkflowState, inferred: Optional[Dict[str, tuple]] = None
+    ) -> None:
+        """Handle several chunks, running sentiment/risk inference once for the whole batch
+        unless `inferred` (from analyze_chunk_contents) already covers them"""
+        if inferred is None:
+            inferred = analyze_chunk_contents([chunk.content for chunk in chunks])
+        for chunk in chunks:
+            self._handle_chunk(chunk, state, *inferred[chunk.content])
+
+    def _handle_chunk(
+        self,
+        chunk: DocumentChunk,
+        state: WorkflowState,
+        sentiment: Any,
+        risks: Any,
+        shenanigans_patterns: Dict[str, float],
+        task: Optional[DecomposedTask] = None,
+    ) -> None:
+        # Load the prior decisions from LTM most relevant to this chunk as context
+        prior_records = self.ltm.search(self.name.value, self.name, chunk.content, top_k=5)
+        prior_good = prior_points(prior_records, "good_points", per_record=3, limit=5)
+        prior_bad = prior_points(prior_records, "bad_points", per_record=3, limit=5)
 
         # Process current chunk with task-specific context
         text = chunk.content.strip()
-        task_type = chunk.metadata.get("task_type", "general_analysis")
-        task_priority = chunk.metadata.get("task_priority", 3)
-        task_metadata = chunk.metadata.get("task_metadata", {})
+        task_type = task.task_type.value if task else "general_analysis"
+        task_priority = task.priority if task else 3
+        task_metadata = task.metadata if task else {}
         
         decisions = extract_good_bad_points(text)
         good_points = decisions["good"]
@@ -222,13 +361,8 @@ class BaseSectionAgent:
             context_header = f"Previous decisions context ({task_type}):\n- GOOD: " + "; ".join(prior_good[:5]) + "\n- BAD: " + "; ".join(prior_bad[:5]) + "\n\n"
         
         summary_body = (text[:800] + ("..." if len(text) > 800 else ""))
-        summary = f"[{self.name.value}] {guidance} - Task: {task_type}\n\n{context_header}{summary_body}"
+        summary = _SUMMARY_PREFIX[self.name] + task_type + "\n\n" + context_header + summary_body
 
-        # Include task-specific analysis with financial shenanigans detection
-        sentiment = analyze_sentiment_finbert(chunk.content) or analyze_sentiment_finbert_stub(chunk.content)
-        shenanigans_patterns = detect_financial_shenanigans(chunk.content) or {}
-        risks = detect_risk_fingpt(chunk.content) or detect_risk_fingpt_stub(chunk.content)
-        
         # Enhance risk detection with shenanigans patterns
         if shenanigans_patterns:
             high_risk_patterns = [
@@ -253,12 +387,8 @@ class BaseSectionAgent:
             "summary": summary
         }
 
-        prev_summary = state.section_summaries.get(self.name, "")
-        combined_summary = (prev_summary + "\n\n" + summary).strip() if prev_summary else summary
-        state.section_summaries[self.name] = combined_summary
-        state.section_findings.setdefault(self.name, {})
-        state.section_findings[self.name].setdefault("sentiment", []).append(sentiment)
-        state.section_findings[self.name].setdefault("risks", []).append(risks)
+        state.section_summaries.setdefault(self.name, []).append(summary)
+        state.add_findings(self.name, sentiment, risks)
 
         self.ltm.upsert(
             agent_name=self.name.value,
@@ -276,24 +406,6 @@ class BaseSectionAgent:
         self.stm.add(AgentMessage(sender=self.name.value, recipient=self.name.value, content=summary))
 
 
-class SupervisorAgent:
-    def __init__(self, ltm: LongTermMemory) -> None:
-        self.ltm = ltm
-        self.stm = ShortTermMemory(capacity=50)
-
-    def route(self, chunk: DocumentChunk) -> SectionName:
-        if chunk.section_hint:
-            return chunk.section_hint
-        guess = guess_section(chunk.content)
-        return guess or SectionName.other
-
-    def aggregate_global(self, state: WorkflowState) -> None:
-        parts = []
-        for name, summary in state.section_summaries.items():
-            parts.append(f"## {name.value}\n{summary}")
-        state.global_report = "\n\n".join(parts)
-
-
 # Specialized agents (extending BaseSectionAgent). These can add custom tool logic later.
 class LetterToShareholdersAgent(BaseSectionAgent):
     pass
@@ -338,35 +450,66 @@ def agno_is_available() -> bool:
     return _AGNO_AVAILABLE
 
 
+_SECTION_PROMPT_TABLE: Dict[SectionName, str] = {
+    section: AGNO_SYSTEM_PROMPTS.get(section.value, AGNO_SYSTEM_PROMPTS["other"])
+    for section in SectionName
+}
+
+
+# Agno tool callables. Repeated texts are served from the transformer_tools result cache,
+# which returns copies and does not keep stub fallbacks.
+def _analyze_sentiment(text: str) -> Dict[str, Any]:
+    return analyze_sentiment_finbert(text) or analyze_sentiment_finbert_stub(text)
+
+
+def _detect_risk(text: str) -> Dict[str, Any]:
+    return detect_risk_fingpt(text) or detect_risk_fingpt_stub(text)
+
+
+_AGNO_TOOLS: Dict[str, Any] = {
+    "analyze_sentiment": _analyze_sentiment,
+    "detect_risk": _detect_risk,
+    "extract_good_bad": extract_good_bad_points,
+    "guess_section": guess_section,
+}
+_SUPERVISOR_PROMPT = AGNO_SYSTEM_PROMPTS.get("supervisor", "Supervisor")
+
+
+def agno_tools() -> Dict[str, Any]:
+    return dict(_AGNO_TOOLS)
+
+
 def build_agno_agents():
     if not _AGNO_AVAILABLE:
         return None
-    tools = {
-        "analyze_sentiment": lambda text: analyze_sentiment_finbert(text)
-        or analyze_sentiment_finbert_stub(text),
-        "detect_risk": lambda text: detect_risk_fingpt(text)
-        or detect_risk_fingpt_stub(text),
-        "extract_good_bad": extract_good_bad_points,
-        "guess_section": guess_section,
-    }
-    # Create Agno agents per section
-    section_agents = {}
-    for section in SectionName:
-        prompt = AGNO_SYSTEM_PROMPTS.get(section.value, AGNO_SYSTEM_PROMPTS["other"])  # type: ignore[index]
-        section_agents[section] = AgnoAgent(
+    # Create Agno agents per section; all agents share the one module-level tools dict
+    section_agents = {
+        section: AgnoAgent(
             name=section.value,
-            instructions=prompt,
-            tools=tools,
+            instructions=_SECTION_PROMPT_TABLE[section],
+            tools=_AGNO_TOOLS,
         )
+        for section in SectionName
+    }
     supervisor = AgnoAgent(
         name="supervisor",
-        instructions=AGNO_SYSTEM_PROMPTS.get("supervisor", "Supervisor"),
-        tools=tools,
+        instructions=_SUPERVISOR_PROMPT,
+        tools=_AGNO_TOOLS,
     )
     return supervisor, section_agents
 
 
+_agno_team_lock = threading.Lock()
+
+
 def build_agno_team():
+    """Return the (team, supervisor, section_agents) triple, building it on first use."""
+    with _agno_team_lock:
+        return _build_agno_team()
+
+
+@lru_cache(maxsize=1)
+def _build_agno_team():
     if not _AGNO_AVAILABLE:
         return None
     made = build_agno_agents()
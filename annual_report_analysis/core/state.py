@@ -1,8 +1,20 @@
 from __future__ import annotations
 
+import io
+import os
+import sys
+from collections import deque
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
+
+
+# `@dataclass(**DATACLASS_SLOTS)` gives slotted dataclasses (no per-instance __dict__)
+# where supported; slots=True needs 3.10. Shared by the record types across the package.
+DATACLASS_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Most recent agent messages kept in WorkflowState.mailbox; older ones are dropped
+MAILBOX_SIZE = int(os.environ.get("ANNUAL_MAILBOX_SIZE", "10000"))
 
 
 class SectionName(str, Enum):
@@ -16,7 +28,7 @@ class SectionName(str, Enum):
     other = "other"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class DocumentChunk:
     chunk_id: str
     section_hint: Optional[SectionName]
@@ -24,7 +36,7 @@ class DocumentChunk:
     meta: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AgentMessage:
     sender: str
     recipient: str
@@ -32,17 +44,47 @@ class AgentMessage:
     context: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class WorkflowState:
     chunks: List[DocumentChunk] = field(default_factory=list)
-    routed_chunks: Dict[SectionName, List[str]] = field(default_factory=lambda: {s: [] for s in SectionName})
-    mailbox: List[AgentMessage] = field(default_factory=list)
-    section_summaries: Dict[SectionName, str] = field(default_factory=dict)
+    # Only sections that received chunks get an entry, as in section_findings
+    routed_chunks: Dict[SectionName, List[str]] = field(default_factory=dict)
+    mailbox: Deque[AgentMessage] = field(default_factory=lambda: deque(maxlen=MAILBOX_SIZE))
+    # Per-chunk summaries in arrival order; joined on demand via section_summary()
+    section_summaries: Dict[SectionName, List[str]] = field(default_factory=dict)
     section_findings: Dict[SectionName, Dict[str, Any]] = field(default_factory=dict)
+    # SupervisorAgent.process_chunk results per chunk id
+    syntheses: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     global_report: Optional[str] = None
     cursor: int = 0
     done: bool = False
 
+    def section_summary(self, section: SectionName) -> str:
+        return "\n\n".join(self.section_summaries.get(section, [])).strip()
+
+    def add_synthesis(self, chunk_id: str, synthesis: Dict[str, Any]) -> None:
+        self.syntheses[chunk_id] = synthesis
+
+    def add_findings(self, section: SectionName, sentiment: Any, risks: Any) -> None:
+        """Record one chunk's sentiment and risks under `section`."""
+        findings = self.section_findings.get(section)
+        if findings is None:
+            findings = self.section_findings[section] = {"sentiment": [], "risks": []}
+        findings["sentiment"].append(sentiment)
+        findings["risks"].append(risks)
+
+    def build_global_report(self) -> str:
+        """Concatenate "## <section>" headed summaries, written straight into one buffer."""
+        buf = io.StringIO()
+        for i, name in enumerate(self.section_summaries):
+            if i:
+                buf.write("\n\n")
+            buf.write("## ")
+            buf.write(name.value)
+            buf.write("\n")
+            buf.write(self.section_summary(name))
+        return buf.getvalue()
+
 
 def init_state() -> WorkflowState:
     return WorkflowState()
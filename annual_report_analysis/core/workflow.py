@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import os
-from typing import Dict
+from typing import Dict, List
 
 from .agents import (
     AuditReportAgent,
@@ -13,9 +13,10 @@ from .agents import (
     MDNAAgent,
     SDG17Agent,
     SupervisorAgent,
+    analyze_chunk_contents,
 )
 from .memory import LongTermMemory
-from .state import SectionName, WorkflowState, init_state
+from .state import DocumentChunk, SectionName, WorkflowState, init_state
 from .tools import load_parsed_document_chunks
 from .agno_support import is_agno_available, run_with_agno
 
@@ -45,15 +46,21 @@ def build_workflow():
         force_agno = os.environ.get("ANNUAL_FORCE_AGNO") == "1"
         if not force_fallback and (force_agno or is_agno_available()):
             return run_with_agno(state)
-        # Fallback to built-in deterministic agents
-        while state.cursor < len(state.chunks):
-            chunk = state.chunks[state.cursor]
+        # Fallback to built-in deterministic agents. Transformer inference runs once, batched
+        # over the distinct contents of every pending chunk, before chunks go to their agents.
+        pending = state.chunks[state.cursor :]
+        inferred = analyze_chunk_contents([chunk.content for chunk in pending])
+        batches: Dict[SectionName, List[DocumentChunk]] = {}
+        for chunk in pending:
             section = supervisor.route(chunk)
             state.routed_chunks.setdefault(section, []).append(chunk.chunk_id)
-            section_agents[section].handle(chunk, state)
-            state.cursor += 1
+            batches.setdefault(section, []).append(chunk)
+        for section, chunks in batches.items():
+            section_agents[section].handle_batch(chunks, state, inferred)
+        state.cursor = len(state.chunks)
         supervisor.aggregate_global(state)
         state.done = True
+        ltm.flush()
         return state
 
     return run
@@ -10,8 +10,11 @@ from .tools import (
 from .enhanced_tools import WebSearchTool, FinanceDataTool, WebCrawlerTool, NewsTool
 from .transformer_tools import (
     analyze_sentiment_finbert,
+    analyze_sentiment_finbert_batch,
     detect_risk_fingpt,
+    detect_risk_fingpt_batch,
     detect_financial_shenanigans,
+    detect_financial_shenanigans_batch,
 )
 from .document_processing import parse_pdf_to_structured_format
 
@@ -26,7 +29,10 @@ __all__ = [
     "WebCrawlerTool",
     "NewsTool",
     "analyze_sentiment_finbert",
+    "analyze_sentiment_finbert_batch",
     "detect_risk_fingpt",
+    "detect_risk_fingpt_batch",
     "detect_financial_shenanigans",
+    "detect_financial_shenanigans_batch",
     "parse_pdf_to_structured_format",
 ]
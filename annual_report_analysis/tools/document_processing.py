@@ -17,6 +17,11 @@ from docling.pipeline.vlm_pipeline import VlmPipeline
 from docling.datamodel.pipeline_options import VlmPipelineOptions
 from docling.datamodel import vlm_model_specs
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
 def parse_pdf_to_structured_format(pdf_path: str, output_dir: str = "output"):
     """
     Parses a PDF file using Docling with SmolDocling VLM and exports to structured formats.
@@ -82,8 +87,13 @@ def parse_pdf_to_structured_format(pdf_path: str, output_dir: str = "output"):
     
     # Export to structured JSON
     json_path = out_path / f"{fname}.json"
-    with json_path.open("w") as fp:
-        json.dump(doc.export_to_dict(), fp, indent=2)
+    if orjson is not None:
+        # Encoded in C straight to bytes; like json.dump it raises (TypeError) on values
+        # it cannot serialize, and non-ASCII text is written as UTF-8 rather than escaped
+        json_path.write_bytes(orjson.dumps(doc.export_to_dict(), option=orjson.OPT_INDENT_2))
+    else:
+        with json_path.open("w") as fp:
+            json.dump(doc.export_to_dict(), fp, indent=2)
     print(f"Exported structured JSON to: {json_path}")
     
     # Export to Markdown (human-readable structured format)
@@ -1,11 +1,43 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
 
 from .state import DocumentChunk, SectionName
 
+try:
+    import ahocorasick  # type: ignore
+except ImportError:
+    ahocorasick = None
+
+V = TypeVar("V")
+
+# Per-text results of guess_section() and extract_good_bad_points(), keyed on a digest of
+# the text so the caches do not keep whole chunks alive
+_CACHE_SIZE = 2048
+_section_cache: "OrderedDict[bytes, Optional[SectionName]]" = OrderedDict()
+_points_cache: "OrderedDict[bytes, Tuple[Tuple[str, ...], Tuple[str, ...]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(cache: "OrderedDict[bytes, Any]", text: str, compute: Callable[[str], Any]) -> Any:
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    result = compute(text)
+    with _cache_lock:
+        cache[key] = result
+        if len(cache) > _CACHE_SIZE:
+            cache.popitem(last=False)
+    return result
+
 
 def load_parsed_document_chunks(
     output_dir: str | Path = "./annual_report_analysis/output",
@@ -70,23 +102,67 @@ def load_parsed_document_chunks(
     return chunks
 
 
+# Section keywords in priority order: when a chunk matches several sections the earliest wins
+_SECTION_KEYWORDS: Tuple[Tuple[SectionName, Tuple[str, ...]], ...] = (
+    (SectionName.letter_to_shareholders, ("letter to shareholders", "letter from the ceo")),
+    (SectionName.mdna, ("management's discussion", "md&a", "mdna")),
+    (SectionName.financial_statements, ("financial statements", "balance sheet", "income statement")),
+    (SectionName.audit_report, ("audit report", "auditors' report")),
+    (SectionName.corporate_governance, ("corporate governance",)),
+    (SectionName.sdg_17, ("sdg 17", "partnerships for the goals")),
+    (SectionName.esg, ("esg", "sustainability")),
+)
+
+
+def build_keyword_matcher(pairs: Iterable[Tuple[str, V]]) -> Callable[[str], Iterator[V]]:
+    """Compile (keyword, value) pairs into a single-pass matcher over lowercased text.
+
+    The returned callable scans the text once and yields the value of every keyword
+    occurrence, overlapping ones included. Keywords are lowercased here.
+    """
+    values_of: Dict[str, List[V]] = {}
+    for keyword, value in pairs:
+        values_of.setdefault(keyword.lower(), []).append(value)
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword, values in values_of.items():
+            automaton.add_word(keyword, tuple(values))
+        automaton.make_automaton()
+        return lambda lower: (v for _, values in automaton.iter(lower) for v in values)
+
+    # Fallback: one regex alternation; the lookahead reports overlapping hits too
+    keywords = list(values_of)
+    pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in keywords) + "))")
+
+    def _match(lower: str) -> Iterator[V]:
+        for m in pattern.finditer(lower):
+            start = m.start()
+            # Report every keyword starting here, not just the longest one
+            for keyword in keywords:
+                if lower.startswith(keyword, start):
+                    yield from values_of[keyword]
+
+    return _match
+
+
+_match_sections = build_keyword_matcher(
+    (keyword, rank) for rank, (_, keywords) in enumerate(_SECTION_KEYWORDS) for keyword in keywords
+)
+
+
 def guess_section(text: str) -> Optional[SectionName]:
-    lower = text.lower()
-    if "letter to shareholders" in lower or "letter from the ceo" in lower:
-        return SectionName.letter_to_shareholders
-    if "management's discussion" in lower or "md&a" in lower or "mdna" in lower:
-        return SectionName.mdna
-    if "financial statements" in lower or "balance sheet" in lower or "income statement" in lower:
-        return SectionName.financial_statements
-    if "audit report" in lower or "auditors' report" in lower:
-        return SectionName.audit_report
-    if "corporate governance" in lower:
-        return SectionName.corporate_governance
-    if "sdg 17" in lower or "partnerships for the goals" in lower:
-        return SectionName.sdg_17
-    if "esg" in lower or "sustainability" in lower:
-        return SectionName.esg
-    return None
+    return _cached(_section_cache, text, _guess_section)
+
+
+def _guess_section(text: str) -> Optional[SectionName]:
+    best = None
+    for rank in _match_sections(text.lower()):
+        if best is None or rank < best:
+            best = rank
+            if best == 0:
+                break
+    return _SECTION_KEYWORDS[best][0] if best is not None else None
 
 
 def analyze_sentiment_finbert_stub(text: str) -> Dict[str, float]:
@@ -135,31 +211,37 @@ _BAD_KEYWORDS = [
 ]
 
 
+_GOOD_RE = re.compile("|".join(re.escape(k) for k in _GOOD_KEYWORDS))
+_BAD_RE = re.compile("|".join(re.escape(k) for k in _BAD_KEYWORDS))
+# A sentence runs up to and including the next terminator (or the end of the text)
+_SENTENCE_RE = re.compile(r"[^.!?\n]*[.!?\n]|[^.!?\n]+$")
+
+
 def split_sentences(text: str) -> List[str]:
     # Very simple splitter; avoids external deps
     parts = []
-    buf = []
-    for ch in text:
-        buf.append(ch)
-        if ch in ".!?\n":
-            s = "".join(buf).strip()
-            if s:
-                parts.append(s)
-            buf = []
-    tail = "".join(buf).strip()
-    if tail:
-        parts.append(tail)
+    for match in _SENTENCE_RE.finditer(text):
+        s = match.group().strip()
+        if s:
+            parts.append(s)
     return parts
 
 
 def extract_good_bad_points(text: str) -> Dict[str, List[str]]:
+    goods, bads = _cached(_points_cache, text, _good_bad_points)
+    # Fresh lists: callers extend the result in place
+    return {"good": list(goods), "bad": list(bads)}
+
+
+def _good_bad_points(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Classification behind extract_good_bad_points; the same chunk is scored by several agents."""
     sentences = split_sentences(text)
     goods: List[str] = []
     bads: List[str] = []
     for s in sentences:
         ls = s.lower()
-        good_hit = any(k in ls for k in _GOOD_KEYWORDS)
-        bad_hit = any(k in ls for k in _BAD_KEYWORDS)
+        good_hit = _GOOD_RE.search(ls) is not None
+        bad_hit = _BAD_RE.search(ls) is not None
         if good_hit and not bad_hit:
             goods.append(s.strip())
         elif bad_hit and not good_hit:
@@ -167,6 +249,4 @@ def extract_good_bad_points(text: str) -> Dict[str, List[str]]:
         elif good_hit and bad_hit:
             # If both, consider as risk-tinged achievement; classify as bad to be conservative
             bads.append(s.strip())
-    return {"good": goods[:20], "bad": bads[:20]}
-
-
+    return tuple(goods[:20]), tuple(bads[:20])
@@ -1,10 +1,44 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
 
 _sentiment_pipeline = None
 _zero_shot_pipeline = None
+_shenanigans_pipeline = None
+_shenanigans_load_attempted = False
+
+# Inputs are truncated to this many characters (~512 tokens) before tokenization.
+MAX_MODEL_CHARS = int(os.environ.get("ANNUAL_MAX_MODEL_CHARS", "2048"))
+# Number of texts per padded forward pass in the *_batch helpers.
+DEFAULT_BATCH_SIZE = 16
+
+# int8 ONNX exports produced by scripts/quantize_models.py; used instead of the fp32
+# HF models when present and onnxruntime/optimum are installed.
+MODEL_DIR = Path(os.environ.get("ANNUAL_MODEL_DIR", "./annual_report_analysis/models"))
+_ONNX_FILE_NAME = "model_quantized.onnx"
+
+# Model outputs memoized per (model, truncated input), bounded LRU
+_CACHE_SIZE = int(os.environ.get("ANNUAL_INFERENCE_CACHE_SIZE", "4096"))
+_result_cache: "OrderedDict[Tuple[str, bytes], Dict[str, float]]" = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+RISK_LABELS = [
+    "market risk",
+    "credit risk",
+    "liquidity risk",
+    "operational risk",
+    "compliance risk",
+    "legal risk",
+    "reputational risk",
+    "strategic risk",
+    "cybersecurity risk",
+]
 
 
 def _lazy_import_transformers():
@@ -15,17 +49,86 @@ def _lazy_import_transformers():
         return None
 
 
-def analyze_sentiment_finbert(text: str) -> Optional[Dict[str, float]]:
-    """Use FinBERT fine-tuned on Financial Shenanigans book for sentiment analysis.
-    
-    Uses model:
-    - harikrushna2272/finbert-shenanigans
-    
-    This model is specifically trained to detect financial manipulation patterns
-    and questionable accounting practices based on the Financial Shenanigans book.
-    """
+def _cache_key(kind: str, text: str) -> Tuple[str, bytes]:
+    """Key on a digest of the model input so long texts are not kept alive by the cache."""
+    data = text[:MAX_MODEL_CHARS].encode("utf-8", "surrogatepass")
+    return kind, hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _cache_get(key: Tuple[str, bytes]) -> Optional[Dict[str, float]]:
+    with _result_cache_lock:
+        result = _result_cache.get(key)
+        if result is None:
+            return None
+        _result_cache.move_to_end(key)
+    return dict(result)
+
+
+def _cache_put(key: Tuple[str, bytes], result: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+    """Store a successful result and return a copy for the caller; failures are not cached."""
+    if result is None or _CACHE_SIZE <= 0:
+        return result
+    with _result_cache_lock:
+        _result_cache[key] = result
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > _CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return dict(result)
+
+
+def _cached_batch(
+    kind: str,
+    texts: List[str],
+    run_batch: Callable[[List[str]], List[Optional[Dict[str, float]]]],
+) -> List[Optional[Dict[str, float]]]:
+    """Serve `texts` from the cache where possible and run `run_batch` on the rest only."""
+    keys = [_cache_key(kind, text) for text in texts]
+    results = [_cache_get(key) for key in keys]
+    misses = [i for i, result in enumerate(results) if result is None]
+    if misses:
+        for i, result in zip(misses, run_batch([texts[i] for i in misses])):
+            results[i] = _cache_put(keys[i], result)
+    return results
+
+
+def _load_onnx_pipeline(task: str, name: str, **kwargs):
+    """Build a HF pipeline over the quantized ONNX model in MODEL_DIR/<name>, if any."""
+    model_dir = MODEL_DIR / name
+    if not (model_dir / _ONNX_FILE_NAME).exists():
+        return None
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification  # type: ignore
+        from transformers import AutoTokenizer, pipeline  # type: ignore
+
+        model = ORTModelForSequenceClassification.from_pretrained(model_dir, file_name=_ONNX_FILE_NAME)
+        tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        return pipeline(task, model=model, tokenizer=tokenizer, **kwargs)
+    except Exception:
+        return None
+
+
+def _maybe_quantize(hf_pipeline):
+    """With ANNUAL_QUANTIZE=1, swap a CPU pipeline's Linear layers for dynamic int8 ones."""
+    if hf_pipeline is None or os.environ.get("ANNUAL_QUANTIZE") != "1":
+        return hf_pipeline
+    try:
+        import torch  # type: ignore
+
+        if hf_pipeline.device.type == "cpu":
+            hf_pipeline.model = torch.quantization.quantize_dynamic(
+                hf_pipeline.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+    except Exception:
+        pass
+    return hf_pipeline
+
+
+def _get_sentiment_pipeline():
     global _sentiment_pipeline
     if _sentiment_pipeline is None:
+        _sentiment_pipeline = _load_onnx_pipeline("sentiment-analysis", "finbert", truncation=True)
+        if _sentiment_pipeline is not None:
+            return _sentiment_pipeline
         pipeline = _lazy_import_transformers()
         if pipeline is None:
             return None
@@ -45,28 +148,115 @@ def analyze_sentiment_finbert(text: str) -> Optional[Dict[str, float]]:
                 )
             except Exception:
                 _sentiment_pipeline = None
-        if _sentiment_pipeline is None:
-            return None
+        _sentiment_pipeline = _maybe_quantize(_sentiment_pipeline)
+    return _sentiment_pipeline
+
+
+def _to_sentiment(item) -> Optional[Dict[str, float]]:
+    if isinstance(item, list):
+        item = item[0] if item else None
+    if not isinstance(item, dict):
+        return None
+    label = str(item.get("label", "NEUTRAL")).lower()
+    score = float(item.get("score", 0.0))
+    positive = score if "pos" in label else 0.0
+    negative = score if "neg" in label else 0.0
+    neutral = score if "neu" in label or label == "neutral" else 0.0
+    return {
+        "positive": positive,
+        "neutral": neutral,
+        "negative": negative,
+        "label": label,
+    }
+
+
+def analyze_sentiment_finbert(text: str) -> Optional[Dict[str, float]]:
+    """Use FinBERT fine-tuned on Financial Shenanigans book for sentiment analysis.
+    
+    Uses model:
+    - harikrushna2272/finbert-shenanigans
+    
+    This model is specifically trained to detect financial manipulation patterns
+    and questionable accounting practices based on the Financial Shenanigans book.
+    """
+    sentiment_pipeline = _get_sentiment_pipeline()
+    if sentiment_pipeline is None:
+        return None
+    key = _cache_key("sentiment", text)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
     try:
-        result = _sentiment_pipeline(text[:2048])  # type: ignore[operator]
+        result = sentiment_pipeline(text[:MAX_MODEL_CHARS])  # type: ignore[operator]
         if isinstance(result, list) and result:
-            item = result[0]
-            label = str(item.get("label", "NEUTRAL")).lower()
-            score = float(item.get("score", 0.0))
-            positive = score if "pos" in label else 0.0
-            negative = score if "neg" in label else 0.0
-            neutral = score if "neu" in label or label == "neutral" else 0.0
-            return {
-                "positive": positive,
-                "neutral": neutral,
-                "negative": negative,
-                "label": label,
-            }
+            return _cache_put(key, _to_sentiment(result[0]))
     except Exception:
         return None
     return None
 
 
+def analyze_sentiment_finbert_batch(
+    texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[Optional[Dict[str, float]]]:
+    """Batched variant of `analyze_sentiment_finbert`.
+
+    Runs all texts through the pipeline in padded batches of `batch_size` and
+    returns one result per input, in order. Entries are None when the model is
+    unavailable or inference fails, so callers can fall back per text.
+    """
+    if not texts:
+        return []
+    sentiment_pipeline = _get_sentiment_pipeline()
+    if sentiment_pipeline is None:
+        return [None] * len(texts)
+
+    def run_batch(batch: List[str]) -> List[Optional[Dict[str, float]]]:
+        try:
+            results = sentiment_pipeline(  # type: ignore[operator]
+                [t[:MAX_MODEL_CHARS] for t in batch], batch_size=batch_size
+            )
+        except Exception:
+            return [None] * len(batch)
+        if not isinstance(results, list) or len(results) != len(batch):
+            return [None] * len(batch)
+        return [_to_sentiment(item) for item in results]
+
+    return _cached_batch("sentiment", texts, run_batch)
+
+
+def _get_shenanigans_pipeline():
+    global _shenanigans_pipeline, _shenanigans_load_attempted
+    if not _shenanigans_load_attempted:
+        _shenanigans_load_attempted = True
+        _shenanigans_pipeline = _load_onnx_pipeline("text-classification", "finbert", truncation=True)
+        if _shenanigans_pipeline is None:
+            pipeline = _lazy_import_transformers()
+            if pipeline is not None:
+                try:
+                    _shenanigans_pipeline = pipeline(
+                        "text-classification",
+                        model="harikrushna2272/finbert-shenanigans",
+                        truncation=True
+                    )
+                except Exception:
+                    _shenanigans_pipeline = None
+            _shenanigans_pipeline = _maybe_quantize(_shenanigans_pipeline)
+    return _shenanigans_pipeline
+
+
+def _to_patterns(result) -> Optional[Dict[str, float]]:
+    if isinstance(result, dict):
+        result = [result]
+    if not isinstance(result, list) or not result:
+        return None
+    patterns = {}
+    for pred in result:
+        label = str(pred.get("label", "NORMAL")).lower()
+        score = float(pred.get("score", 0.0))
+        patterns[label] = score
+    return patterns
+
+
 def detect_financial_shenanigans(text: str) -> Optional[Dict[str, float]]:
     """
     Specialized function to detect potential financial shenanigans patterns
@@ -76,79 +266,123 @@ def detect_financial_shenanigans(text: str) -> Optional[Dict[str, float]]:
         Dict with probabilities for different types of financial manipulation patterns,
         or None if the model is not available.
     """
-    global _shenanigans_pipeline
-    if not hasattr(detect_financial_shenanigans, '_shenanigans_pipeline'):
-        _shenanigans_pipeline = None
-        pipeline = _lazy_import_transformers()
-        if pipeline is not None:
-            try:
-                _shenanigans_pipeline = pipeline(
-                    "text-classification",
-                    model="harikrushna2272/finbert-shenanigans",
-                    truncation=True
-                )
-            except Exception:
-                _shenanigans_pipeline = None
-    
-    if _shenanigans_pipeline is None:
+    shenanigans_pipeline = _get_shenanigans_pipeline()
+    if shenanigans_pipeline is None:
         return None
-        
+    key = _cache_key("shenanigans", text)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
     try:
-        result = _shenanigans_pipeline(text[:2048])
-        if isinstance(result, list) and result:
-            patterns = {}
-            for pred in result:
-                label = str(pred.get("label", "NORMAL")).lower()
-                score = float(pred.get("score", 0.0))
-                patterns[label] = score
-            return patterns
+        return _cache_put(key, _to_patterns(shenanigans_pipeline(text[:MAX_MODEL_CHARS])))
     except Exception:
         return None
-    
-    return None
 
-def detect_risk_fingpt(text: str) -> Optional[List[str]]:
-    """Use GPT4-style model for financial risk analysis if available, else None.
 
-    Tries models:
-    - jkpeer/fingpt-sentiment
-    - phidata/fingpt-sentiment
-    """
+def detect_financial_shenanigans_batch(
+    texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE
+) -> List[Optional[Dict[str, float]]]:
+    """Batched variant of `detect_financial_shenanigans`; one result (or None) per input text."""
+    if not texts:
+        return []
+    shenanigans_pipeline = _get_shenanigans_pipeline()
+    if shenanigans_pipeline is None:
+        return [None] * len(texts)
+
+    def run_batch(batch: List[str]) -> List[Optional[Dict[str, float]]]:
+        try:
+            results = shenanigans_pipeline(  # type: ignore[operator]
+                [t[:MAX_MODEL_CHARS] for t in batch], batch_size=batch_size
+            )
+        except Exception:
+            return [None] * len(batch)
+        if not isinstance(results, list) or len(results) != len(batch):
+            return [None] * len(batch)
+        return [_to_patterns(result) for result in results]
+
+    return _cached_batch("shenanigans", texts, run_batch)
+
+
+def _get_zero_shot_pipeline():
     global _zero_shot_pipeline
-    if labels is None:
-        labels = [
-            "market risk",
-            "credit risk",
-            "liquidity risk",
-            "operational risk",
-            "compliance risk",
-            "legal risk",
-            "reputational risk",
-            "strategic risk",
-            "cybersecurity risk",
-        ]
     if _zero_shot_pipeline is None:
+        _zero_shot_pipeline = _load_onnx_pipeline("zero-shot-classification", "zero_shot")
+        if _zero_shot_pipeline is not None:
+            return _zero_shot_pipeline
         pipeline = _lazy_import_transformers()
         if pipeline is None:
             return None
         try:
-            _zero_shot_pipeline = pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+            _zero_shot_pipeline = _maybe_quantize(
+                pipeline("zero-shot-classification", model="facebook/bart-large-mnli")
+            )
         except Exception:
             return None
+    return _zero_shot_pipeline
+
+
+def _to_risk_scores(res) -> Optional[Dict[str, float]]:
+    scores = res.get("scores") if isinstance(res, dict) else None
+    candidate_labels = res.get("labels") if isinstance(res, dict) else None
+    if not scores or not candidate_labels:
+        return None
+    out: Dict[str, float] = {}
+    for label, score in zip(candidate_labels, scores):
+        try:
+            out[str(label).replace(" ", "_")] = float(score)
+        except Exception:
+            continue
+    return out
+
+
+def detect_risk_fingpt(text: str, labels: Optional[List[str]] = None) -> Optional[Dict[str, float]]:
+    """Use GPT4-style model for financial risk analysis if available, else None.
+
+    Tries models:
+    - jkpeer/fingpt-sentiment
+    - phidata/fingpt-sentiment
+    """
+    if labels is None:
+        labels = RISK_LABELS
+    zero_shot_pipeline = _get_zero_shot_pipeline()
+    if zero_shot_pipeline is None:
+        return None
+    key = _cache_key("risk:" + "|".join(labels), text)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
     try:
-        res = _zero_shot_pipeline(text[:2048], labels, multi_label=True)  # type: ignore[operator]
-        scores = res.get("scores") if isinstance(res, dict) else None
-        candidate_labels = res.get("labels") if isinstance(res, dict) else None
-        if not scores or not candidate_labels:
-            return None
-        out: Dict[str, float] = {}
-        for label, score in zip(candidate_labels, scores):
-            try:
-                out[str(label).replace(" ", "_")] = float(score)
-            except Exception:
-                continue
-        return out
+        res = zero_shot_pipeline(text[:MAX_MODEL_CHARS], labels, multi_label=True)  # type: ignore[operator]
+        return _cache_put(key, _to_risk_scores(res))
     except Exception:
         return None
 
 
+def detect_risk_fingpt_batch(
+    texts: List[str],
+    labels: Optional[List[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Optional[Dict[str, float]]]:
+    """Batched variant of `detect_risk_fingpt`; one result (or None) per input text."""
+    if not texts:
+        return []
+    if labels is None:
+        labels = RISK_LABELS
+    zero_shot_pipeline = _get_zero_shot_pipeline()
+    if zero_shot_pipeline is None:
+        return [None] * len(texts)
+
+    def run_batch(batch: List[str]) -> List[Optional[Dict[str, float]]]:
+        try:
+            results = zero_shot_pipeline(  # type: ignore[operator]
+                [t[:MAX_MODEL_CHARS] for t in batch], labels, multi_label=True, batch_size=batch_size
+            )
+        except Exception:
+            return [None] * len(batch)
+        if isinstance(results, dict):
+            results = [results]
+        if not isinstance(results, list) or len(results) != len(batch):
+            return [None] * len(batch)
+        return [_to_risk_scores(res) for res in results]
+
+    return _cached_batch("risk:" + "|".join(labels), texts, run_batch)
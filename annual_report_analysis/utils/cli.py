@@ -28,16 +28,17 @@ def main() -> None:
 
     out_dir = Path("./annual_report_analysis/output")
     out_dir.mkdir(parents=True, exist_ok=True)
-    (out_dir / "analysis_summary.json").write_text(
-        json.dumps(
+    # Encoded straight into the file rather than built as one string first
+    with (out_dir / "analysis_summary.json").open("w") as fp:
+        json.dump(
             {
-                "section_summaries": {k.value: v for k, v in final_state.section_summaries.items()},
+                "section_summaries": {k.value: final_state.section_summary(k) for k in final_state.section_summaries},
                 "section_findings": {k.value: v for k, v in final_state.section_findings.items()},
                 "global_report": final_state.global_report,
             },
+            fp,
             indent=2,
         )
-    )
     print("Analysis complete. See annual_report_analysis/output/analysis_summary.json")
 
 
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+"""
+Export the sentiment and risk models to ONNX and quantize them to int8.
+
+The quantized models are picked up by transformer_tools from ANNUAL_MODEL_DIR
+(default ./annual_report_analysis/models) for faster CPU inference.
+Requires: pip install -e ".[onnx]"
+"""
+
+import os
+import sys
+from pathlib import Path
+
+
+MODELS = {
+    "finbert": "harikrushna2272/finbert-shenanigans",
+    "zero_shot": "facebook/bart-large-mnli",
+}
+
+
+def quantize_model(model_id: str, out_dir: Path):
+    """Export a sequence-classification model to ONNX and apply dynamic int8 quantization."""
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    model = ORTModelForSequenceClassification.from_pretrained(model_id, export=True)
+    model.save_pretrained(out_dir)
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(out_dir)
+
+    quantizer = ORTQuantizer.from_pretrained(model)
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    # Writes model_quantized.onnx next to the fp32 export
+    quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+
+
+def main():
+    """Quantize all models used by transformer_tools."""
+    model_dir = Path(os.environ.get("ANNUAL_MODEL_DIR", "./annual_report_analysis/models"))
+    for name, model_id in MODELS.items():
+        try:
+            quantize_model(model_id, model_dir / name)
+            print(f"Quantized {model_id} to {model_dir / name}")
+        except Exception as e:
+            print(f"Error quantizing {model_id}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
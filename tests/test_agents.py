@@ -4,6 +4,8 @@ from annual_report_analysis.agents import (
     BaseSectionAgent,
     SupervisorAgent,
     TaskDecomposer,
+    DecomposedTask,
+    TaskType,
     ShortTermMemory,
     LongTermMemory
 )
@@ -47,6 +49,50 @@ def test_task_decomposition():
     assert any(task.task_type.value == "financial_analysis" for task in tasks)
     assert any(task.task_type.value == "risk_assessment" for task in tasks)
 
+def _task(task_type, priority, dependencies=()):
+    return DecomposedTask(
+        task_type=task_type,
+        content="",
+        priority=priority,
+        dependencies=list(dependencies),
+        metadata={},
+        target_agents=[],
+    )
+
+def test_organize_tasks_levels(temp_dir):
+    """Test dependency levels, priority order within a level and ignored absent dependencies."""
+    supervisor = SupervisorAgent(ltm=LongTermMemory(base_dir=temp_dir))
+    tasks = [
+        _task(TaskType.RISK_ASSESSMENT, 3, ["financial_analysis"]),
+        _task(TaskType.MARKET_ANALYSIS, 2),
+        _task(TaskType.FINANCIAL_ANALYSIS, 1),
+        _task(TaskType.STRATEGY_REVIEW, 4, ["risk_assessment", "market_analysis"]),
+        # Depends on a task type that is not part of this chunk
+        _task(TaskType.GOVERNANCE_REVIEW, 5, ["compliance_check"]),
+    ]
+
+    levels = supervisor._organize_tasks(tasks)
+    assert [[t.task_type.value for t in level] for level in levels] == [
+        ["governance_review", "market_analysis", "financial_analysis"],
+        ["risk_assessment"],
+        ["strategy_review"],
+    ]
+
+def test_organize_tasks_cycle(temp_dir):
+    """Test that tasks in a dependency cycle still run, together in a last level."""
+    supervisor = SupervisorAgent(ltm=LongTermMemory(base_dir=temp_dir))
+    tasks = [
+        _task(TaskType.FINANCIAL_ANALYSIS, 1),
+        _task(TaskType.RISK_ASSESSMENT, 2, ["market_analysis"]),
+        _task(TaskType.MARKET_ANALYSIS, 3, ["risk_assessment"]),
+    ]
+
+    levels = supervisor._organize_tasks(tasks)
+    assert [[t.task_type.value for t in level] for level in levels] == [
+        ["financial_analysis"],
+        ["market_analysis", "risk_assessment"],
+    ]
+
 def test_memory_operations():
     """Test memory operations."""
     stm = ShortTermMemory()
@@ -57,3 +103,61 @@ def test_memory_operations():
         stm.add({"id": i, "content": f"Message {i}"})
     
     assert len(stm.messages) == 20  # Default capacity
+
+def test_long_term_memory_cache(temp_dir):
+    """Test that LTM queries reflect upserts and stay bounded."""
+    ltm = LongTermMemory(base_dir=temp_dir, max_cached_records=3)
+    assert ltm.query_all("mdna", SectionName.mdna) == []
+
+    for i in range(5):
+        ltm.upsert("mdna", SectionName.mdna, f"chunk_{i}", {"good_points": [str(i)]})
+
+    records = ltm.query_all("mdna", SectionName.mdna)
+    assert [r["key"] for r in records] == [f"chunk_{i}" for i in range(5)]
+    # Recent records come from the bounded in-memory cache
+    assert ltm.query_recent("mdna", SectionName.mdna, limit=10) == records[-3:]
+    assert ltm.query_recent("mdna", SectionName.mdna, limit=2) == records[-2:]
+
+    # A fresh instance reloads the same records from disk
+    ltm.close()
+    reloaded = LongTermMemory(base_dir=temp_dir, max_cached_records=3)
+    assert reloaded.query_all("mdna", SectionName.mdna) == records
+    assert reloaded.query_recent("mdna", SectionName.mdna, limit=10) == records[-3:]
+
+def test_long_term_memory_appends(temp_dir):
+    """Test that records sharing a key are all kept and the database opens lazily."""
+    with LongTermMemory(base_dir=temp_dir) as ltm:
+        assert not (temp_dir / "ltm.db").exists()
+        ltm.upsert("mdna", SectionName.mdna, "chunk_0", {"task_type": "risk_assessment"})
+        ltm.upsert("mdna", SectionName.mdna, "chunk_0", {"task_type": "market_analysis"})
+        assert [r["value"]["task_type"] for r in ltm.query_recent("mdna", SectionName.mdna)] == [
+            "risk_assessment",
+            "market_analysis",
+        ]
+
+    reloaded = LongTermMemory(base_dir=temp_dir)
+    assert len(reloaded.query_all("mdna", SectionName.mdna)) == 2
+    reloaded.close()
+
+def test_long_term_memory_search(temp_dir):
+    """Test relevance-ranked retrieval of prior decisions."""
+    ltm = LongTermMemory(base_dir=temp_dir)
+    ltm.upsert("mdna", SectionName.mdna, "chunk_0", {"good_points": ["Revenue growth was strong"]})
+    ltm.upsert("mdna", SectionName.mdna, "chunk_1", {"bad_points": ["Litigation risk increased"]})
+    ltm.upsert("mdna", SectionName.mdna, "chunk_2", {"good_points": ["New plant opened"]})
+
+    results = ltm.search("mdna", SectionName.mdna, "Pending litigation against the company", top_k=5)
+    assert [r["key"] for r in results] == ["chunk_1"]
+    assert ltm.search("mdna", SectionName.mdna, "dividend") == []
+
+def test_collaborative_memory_cross_references():
+    """Test that cross-references are symmetric and deduplicated."""
+    from annual_report_analysis.agents.collaborative_memory import CollaborativeMemory
+
+    memory = CollaborativeMemory()
+    memory.add_cross_reference("mdna", "esg")
+    memory.add_cross_references([("mdna", "esg"), ("mdna", "audit_report")])
+
+    assert memory.get_related_sections("mdna") == ["esg", "audit_report"]
+    assert memory.get_related_sections("esg") == ["mdna"]
+    assert memory.get_related_sections("audit_report") == ["mdna"]
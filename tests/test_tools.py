@@ -43,3 +43,77 @@ def test_load_parsed_document_chunks(temp_dir):
     chunks = load_parsed_document_chunks(output_dir=str(temp_dir))
     assert len(chunks) > 0
     assert chunks[0].section_hint.value == "letter_to_shareholders"
+
+def test_batch_transformers_empty_input():
+    """Batched transformer helpers return one result per input."""
+    from annual_report_analysis.tools import (
+        analyze_sentiment_finbert_batch,
+        detect_risk_fingpt_batch,
+    )
+
+    assert analyze_sentiment_finbert_batch([]) == []
+    assert detect_risk_fingpt_batch([]) == []
+
+def test_batch_transformers_with_fake_pipelines(monkeypatch):
+    """Batched helpers keep input order, map failures to None and only run cache misses."""
+    from collections import OrderedDict
+    from annual_report_analysis.tools import transformer_tools
+
+    monkeypatch.setattr(transformer_tools, "_result_cache", OrderedDict())
+    sentiment_calls = []
+
+    def fake_sentiment(batch, batch_size=None):
+        sentiment_calls.append(list(batch))
+        # Texts containing "garbled" get an unusable model output
+        return [
+            None if "garbled" in t else {"label": "positive" if "up" in t else "negative", "score": 0.9}
+            for t in batch
+        ]
+
+    monkeypatch.setattr(transformer_tools, "_get_sentiment_pipeline", lambda: fake_sentiment)
+
+    results = transformer_tools.analyze_sentiment_finbert_batch(["sales up", "garbled", "sales down"])
+    assert [r and r["label"] for r in results] == ["positive", None, "negative"]
+    assert sentiment_calls == [["sales up", "garbled", "sales down"]]
+
+    # Cached results are served without the model; failures are not cached and are retried
+    results = transformer_tools.analyze_sentiment_finbert_batch(["sales down", "margin up", "garbled", "sales up"])
+    assert [r and r["label"] for r in results] == ["negative", "positive", None, "positive"]
+    assert sentiment_calls[1] == ["margin up", "garbled"]
+
+    risk_calls = []
+
+    def fake_zero_shot(batch, labels, multi_label=False, batch_size=None):
+        risk_calls.append(list(batch))
+        if any("boom" in t for t in batch):
+            raise RuntimeError("inference failed")
+        return [{"labels": labels, "scores": [0.5] * len(labels)} for _ in batch]
+
+    monkeypatch.setattr(transformer_tools, "_get_zero_shot_pipeline", lambda: fake_zero_shot)
+
+    results = transformer_tools.detect_risk_fingpt_batch(["a", "b"], labels=["market risk"])
+    assert results == [{"market_risk": 0.5}, {"market_risk": 0.5}]
+    # A failing batch yields None for each of its texts; cached texts are unaffected
+    assert transformer_tools.detect_risk_fingpt_batch(["boom", "a"], labels=["market risk"]) == [None, {"market_risk": 0.5}]
+    assert risk_calls == [["a", "b"], ["boom"]]
+
+def test_keyword_matcher_regex_fallback(monkeypatch):
+    """Without pyahocorasick the matcher still reports overlapping and shared keywords."""
+    from annual_report_analysis.tools import tools
+
+    monkeypatch.setattr(tools, "ahocorasick", None)
+    match = tools.build_keyword_matcher(
+        [("Material Weakness", "mw"), ("weakness", "w"), ("risk", "r"), ("risk", "r2"), ("aa", "a")]
+    )
+
+    assert sorted(match("material weakness and risk")) == ["mw", "r", "r2", "w"]
+    # Overlapping occurrences of the same keyword are each reported
+    assert list(match("aaa")) == ["a", "a"]
+    assert list(match("no hits here")) == []
+
+def test_guess_section_priority():
+    """When several sections match, the earliest one in priority order wins."""
+    text = "ESG highlights, the balance sheet and management's discussion of results"
+    assert guess_section(text).value == "mdna"
+    assert guess_section("Corporate governance and sustainability").value == "corporate_governance"
+    assert guess_section("Nothing relevant") is None